@@ -4,34 +4,187 @@ Helper script to find correspondences between Aromanian and Romanian articles.
 Articles are considered corresponding if they share the same image URL.
 """
 
-import os
+import argparse
 import json
+import os
+import pickle
+import shutil
+import sqlite3
 import subprocess
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Linux-only: batch file reads through io_uring instead of one
+# syscall round-trip per file
+try:
+    import liburing
+except ImportError:
+    liburing = None
+
+# Bloom prefilter: answers "definitely not indexed" with a few bit tests,
+# which is cheaper than a dict lookup when most image URLs have no match
+try:
+    from pybloom_live import BloomFilter
+except ImportError:
+    BloomFilter = None
+
+# Aho-Corasick: find every Aromanian image URL in a Romanian file with
+# one linear scan of its raw text, no JSON parsing at all
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+URING_BATCH = 64
+
+
+def _loads(data: bytes) -> dict:
+    """Parse JSON bytes, using orjson when available."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _load_json(path) -> dict:
+    """Parse a JSON file, using orjson when available."""
+    with open(path, 'rb') as f:
+        return _loads(f.read())
+
+
+def _read_files_uring(paths: list[str]) -> list[tuple[str, bytes]]:
+    """
+    Read many small files through a single io_uring, submitting reads in
+    batches of URING_BATCH and reaping completions in bulk.
+    """
+    results = []
+    ring = liburing.Ring()
+    liburing.io_uring_queue_init(URING_BATCH, ring)
+    cqe = liburing.Cqe()
+    try:
+        for start in range(0, len(paths), URING_BATCH):
+            batch = paths[start:start + URING_BATCH]
+            fds = [None] * len(batch)
+            bufs = [None] * len(batch)
+            data = [None] * len(batch)
+            pending = 0
+
+            for i, path in enumerate(batch):
+                try:
+                    fd = os.open(path, os.O_RDONLY)
+                    size = os.fstat(fd).st_size
+                except OSError as e:
+                    print(f"Error reading {path}: {e}")
+                    continue
+                fds[i] = fd
+                if size == 0:
+                    data[i] = b''
+                    continue
+                bufs[i] = bytearray(size)
+                sqe = liburing.io_uring_get_sqe(ring)
+                liburing.io_uring_prep_read(sqe, fd, bufs[i])
+                sqe.user_data = i
+                pending += 1
+
+            if pending:
+                liburing.io_uring_submit(ring)
+                while pending:
+                    liburing.io_uring_wait_cqe(ring, cqe)
+                    ready = liburing.io_uring_cq_ready(ring)
+                    for j in range(ready):
+                        done = cqe[j]
+                        i = done.user_data
+                        if done.res >= 0:
+                            data[i] = bytes(bufs[i][:done.res])
+                        else:
+                            print(f"Error reading {batch[i]}: errno {-done.res}")
+                    liburing.io_uring_cq_advance(ring, ready)
+                    pending -= ready
+
+            for fd in fds:
+                if fd is not None:
+                    os.close(fd)
+            results.extend((path, blob) for path, blob in zip(batch, data)
+                           if blob is not None)
+    finally:
+        liburing.io_uring_queue_exit(ring)
+    return results
+
+
+def _read_files(paths: list[str]) -> list[tuple[str, bytes]]:
+    """Read files as (path, bytes) pairs, via io_uring when available."""
+    if liburing is not None:
+        try:
+            return _read_files_uring(paths)
+        except OSError as e:
+            # e.g. io_uring disabled by seccomp; fall through to plain reads
+            print(f"io_uring unavailable ({e}), using buffered reads")
+
+    results = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                results.append((path, f.read()))
+        except OSError as e:
+            print(f"Error reading {path}: {e}")
+    return results
+
 # Directories
 AROMANIAN_ARTICLES_DIR = "output_ro_ar/articles"
 ROMANIAN_ARTICLES_DIR = "output_actualitate/articles"
 OUTPUT_FILE = "correspondences.json"
+CACHE_FILE = "aromanian_cache.pkl"
+
+
+def _list_json_files(directory) -> list[os.DirEntry]:
+    """
+    Enumerate *.json entries with os.scandir, which batches getdents and
+    caches stat results on the returned DirEntry objects.
+    """
+    with os.scandir(directory) as it:
+        return sorted((e for e in it if e.name.endswith('.json') and e.is_file()),
+                      key=lambda e: e.name)
+
+
+def _load_cache() -> dict[str, tuple[float, int, list[str]]]:
+    """Load the (mtime, size, image_urls) cache from a previous run."""
+    try:
+        with open(CACHE_FILE, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        print(f"Ignoring unreadable cache {CACHE_FILE}: {e}")
+        return {}
+
+
+def _save_cache(cache: dict[str, tuple[float, int, list[str]]]):
+    with open(CACHE_FILE, 'wb') as f:
+        pickle.dump(cache, f)
 
 
 def find_romanian_articles_with_image(image_url: str, romanian_dir: str) -> list[str]:
     """
     Find Romanian article filenames that contain the given image URL.
-    Uses grep for efficient searching.
+
+    Low-memory fallback for corpora too large to index in RAM: searches
+    with ripgrep when available (parallel traversal, much faster), else
+    grep. Both run with -F since URLs contain regex metacharacters.
     """
     if not image_url or image_url.startswith("data:"):
         return []
-    
+
+    if shutil.which("rg"):
+        cmd = ["rg", "-l", "--no-heading", "-F", image_url, romanian_dir]
+    else:
+        cmd = ["grep", "-rlF", image_url, romanian_dir]
+
     try:
-        # Use grep to search for the image URL in Romanian articles
-        result = subprocess.run(
-            ["grep", "-rl", image_url, romanian_dir],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+
         if result.returncode == 0 and result.stdout.strip():
             # Extract just the filenames from the full paths
             matches = []
@@ -49,69 +202,277 @@ def find_romanian_articles_with_image(image_url: str, romanian_dir: str) -> list
         return []
 
 
+def _scan_chunk(paths: list[str]) -> dict[str, list[str]]:
+    """
+    Worker: parse a chunk of Romanian article files and return a partial
+    image URL -> article filenames map. Runs in a separate process.
+    """
+    partial: dict[str, list[str]] = defaultdict(list)
+
+    for path, data in _read_files(paths):
+        try:
+            article = _loads(data)
+        except ValueError as e:
+            print(f"Error parsing {path}: {e}")
+            continue
+
+        filename = os.path.basename(path)
+        for image_url in article.get("image_urls", []):
+            # Skip empty strings and data URLs
+            if not image_url or image_url.startswith("data:"):
+                continue
+            partial[image_url].append(filename)
+
+    return partial
+
+
+# Automaton shared with worker processes via the pool initializer so it
+# is pickled once per worker instead of once per chunk
+_AC_AUTOMATON = None
+
+
+def _init_ac(automaton):
+    global _AC_AUTOMATON
+    _AC_AUTOMATON = automaton
+
+
+def _scan_chunk_ac(paths: list[str]) -> dict[str, list[str]]:
+    """
+    Worker: stream each Romanian article file through the Aho-Corasick
+    automaton, collecting which Aromanian image URLs it contains.
+    """
+    partial: dict[str, list[str]] = defaultdict(list)
+
+    for path, data in _read_files(paths):
+        filename = os.path.basename(path)
+        seen = set()
+        for _, image_url in _AC_AUTOMATON.iter(data.decode('utf-8', 'replace')):
+            if image_url not in seen:
+                seen.add(image_url)
+                partial[image_url].append(filename)
+
+    return partial
+
+
+def _parallel_scan(worker, files: list[str], initializer=None,
+                   initargs=()) -> dict[str, set[str]]:
+    """
+    Shard files across worker processes and merge the partial
+    image URL -> filenames maps each one returns.
+    """
+    index: dict[str, set[str]] = defaultdict(set)
+    if not files:
+        return index
+
+    workers = min(os.cpu_count() or 1, len(files))
+    chunk_size = -(-len(files) // workers)  # ceiling division
+    chunks = [files[i:i + chunk_size]
+              for i in range(0, len(files), chunk_size)]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as executor:
+        for partial in executor.map(worker, chunks):
+            for image_url, filenames in partial.items():
+                index[image_url].update(filenames)
+
+    return index
+
+
+def build_image_index_ac(romanian_dir: Path,
+                         image_urls: set[str]) -> dict[str, set[str]]:
+    """
+    Build the image URL -> Romanian article filenames map by scanning the
+    raw file text with an Aho-Corasick automaton over the Aromanian image
+    URLs. O(bytes) per file with no JSON parsing; only URLs we will
+    actually look up end up in the index.
+    """
+    index: dict[str, set[str]] = defaultdict(set)
+    if not image_urls:
+        return index
+
+    automaton = ahocorasick.Automaton()
+    for url in image_urls:
+        automaton.add_word(url, url)
+    automaton.make_automaton()
+
+    romanian_files = [e.path for e in _list_json_files(romanian_dir)]
+    print(f"Scanning {len(romanian_files)} Romanian articles "
+          f"for {len(image_urls)} image URLs...")
+
+    index = _parallel_scan(_scan_chunk_ac, romanian_files,
+                           initializer=_init_ac, initargs=(automaton,))
+
+    print(f"Found {len(index)} image URLs in the Romanian corpus")
+    return index
+
+
+def build_image_index_from_db(db_path: Path,
+                              romanian_dir: Path) -> dict[str, set[str]] | None:
+    """
+    Build the image URL -> Romanian article filenames map from the
+    crawler's SQLite img_idx table — no JSON parsing at all.
+
+    Returns None when the database does not cover the JSON corpus (e.g.
+    articles crawled before the mirror existed), so the caller falls
+    back to scanning the files.
+    """
+    json_count = len(_list_json_files(romanian_dir))
+    index: dict[str, set[str]] = defaultdict(set)
+    con = sqlite3.connect(db_path)
+    try:
+        db_count = con.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        if db_count < json_count:
+            print(f"Warning: {db_path} covers {db_count} of {json_count} "
+                  f"articles; scanning the JSON files instead")
+            return None
+        for image_url, filename in con.execute(
+                "SELECT image_url, filename FROM img_idx"):
+            index[image_url].add(filename)
+    except sqlite3.Error as e:
+        print(f"Warning: could not read {db_path} ({e}); "
+              f"scanning the JSON files instead")
+        return None
+    finally:
+        con.close()
+    print(f"Indexed {len(index)} unique image URLs from {db_path}")
+    return index
+
+
+def build_image_index(romanian_dir: Path) -> dict[str, set[str]]:
+    """
+    Build an inverted index mapping image URL -> Romanian article filenames.
+    The JSON parsing is CPU-bound, so the corpus is sharded across worker
+    processes; lookups afterwards are O(1).
+    """
+    romanian_files = [e.path for e in _list_json_files(romanian_dir)]
+    print(f"Indexing {len(romanian_files)} Romanian articles...")
+
+    index = _parallel_scan(_scan_chunk, romanian_files)
+
+    print(f"Indexed {len(index)} unique image URLs")
+    return index
+
+
 def main():
+    parser = argparse.ArgumentParser(
+        description='Find Aromanian/Romanian article correspondences by shared image URL')
+    parser.add_argument('--low-memory', action='store_true',
+                        help='Search the Romanian corpus with rg/grep per URL '
+                             'instead of building an in-memory index')
+    args = parser.parse_args()
+
     correspondences = []
-    
+
     aromanian_dir = Path(AROMANIAN_ARTICLES_DIR)
     romanian_dir = Path(ROMANIAN_ARTICLES_DIR)
-    
+
     if not aromanian_dir.exists():
         print(f"Error: Aromanian articles directory not found: {aromanian_dir}")
         return
-    
+
     if not romanian_dir.exists():
         print(f"Error: Romanian articles directory not found: {romanian_dir}")
         return
-    
+
     # Get all Aromanian article files
-    aromanian_files = sorted(aromanian_dir.glob("*.json"))
+    aromanian_files = _list_json_files(aromanian_dir)
     total = len(aromanian_files)
-    
+
     print(f"Processing {total} Aromanian articles...")
-    
-    for i, article_path in enumerate(aromanian_files, 1):
+
+    # Cache parsed image_urls keyed by (mtime, size) so unchanged files
+    # are skipped on re-runs with nothing but the scandir metadata.
+    cache = _load_cache()
+
+    # Collect (filename, deduped image URLs) per Aromanian article first;
+    # the full URL set feeds the Aho-Corasick scan of the Romanian corpus
+    aromanian_articles: list[tuple[str, set[str]]] = []
+    for entry in aromanian_files:
         try:
-            with open(article_path, 'r', encoding='utf-8') as f:
-                article = json.load(f)
-            
-            image_urls = article.get("image_urls", [])
-            aromanian_filename = article_path.name
-            
-            # Collect all Romanian matches for this Aromanian article
-            romanian_matches = set()
-            
-            for image_url in image_urls:
-                # Skip empty strings and data URLs
-                if not image_url or image_url.startswith("data:"):
-                    continue
-                
-                matches = find_romanian_articles_with_image(image_url, str(romanian_dir))
-                romanian_matches.update(matches)
-            
-            # Only add if we found correspondences
-            if romanian_matches:
-                correspondences.append({
-                    "aromanian_article": aromanian_filename,
-                    "romanian_articles": sorted(list(romanian_matches))
-                })
-                print(f"[{i}/{total}] {aromanian_filename}: found {len(romanian_matches)} Romanian match(es)")
+            st = entry.stat()
+            cached = cache.get(entry.path)
+            if cached and cached[0] == st.st_mtime and cached[1] == st.st_size:
+                image_urls = cached[2]
             else:
-                if i % 100 == 0:
-                    print(f"[{i}/{total}] Processing...")
-                    
-        except json.JSONDecodeError as e:
-            print(f"Error parsing {article_path}: {e}")
+                article = _load_json(entry.path)
+                image_urls = article.get("image_urls", [])
+                cache[entry.path] = (st.st_mtime, st.st_size, image_urls)
+        except ValueError as e:
+            print(f"Error parsing {entry.path}: {e}")
+            continue
         except Exception as e:
-            print(f"Error processing {article_path}: {e}")
-    
+            print(f"Error processing {entry.path}: {e}")
+            continue
+
+        # Deduplicate (galleries often repeat the lead image) and drop
+        # empty strings and data URLs up front
+        aromanian_articles.append((entry.name,
+                                   set(u for u in image_urls
+                                       if u and not u.startswith("data:"))))
+
+    _save_cache(cache)
+
+    all_image_urls = set().union(*(urls for _, urls in aromanian_articles)) \
+        if aromanian_articles else set()
+
+    # One pass over the Romanian corpus, then O(1) lookups per image URL.
+    # Prefer the crawler's SQLite image index, then the Aho-Corasick raw
+    # scan, then the JSON-parsing scan.
+    romanian_db = romanian_dir.parent / "articles.db"
+    if args.low_memory:
+        image_index = None
+    else:
+        image_index = None
+        if romanian_db.exists():
+            image_index = build_image_index_from_db(romanian_db, romanian_dir)
+        if image_index is None:
+            if ahocorasick is not None:
+                image_index = build_image_index_ac(romanian_dir, all_image_urls)
+            else:
+                image_index = build_image_index(romanian_dir)
+
+    bloom = None
+    if image_index and BloomFilter is not None:
+        bloom = BloomFilter(capacity=len(image_index), error_rate=0.001)
+        for url in image_index:
+            bloom.add(url)
+
+    for i, (aromanian_filename, image_urls) in enumerate(aromanian_articles, 1):
+        # Collect all Romanian matches for this Aromanian article
+        romanian_matches = set()
+
+        for image_url in image_urls:
+            if image_index is None:
+                romanian_matches.update(
+                    find_romanian_articles_with_image(image_url, str(romanian_dir)))
+            else:
+                if bloom is not None and image_url not in bloom:
+                    continue
+                romanian_matches.update(image_index.get(image_url, ()))
+
+        # Only add if we found correspondences
+        if romanian_matches:
+            correspondences.append({
+                "aromanian_article": aromanian_filename,
+                "romanian_articles": sorted(list(romanian_matches))
+            })
+            print(f"[{i}/{total}] {aromanian_filename}: found {len(romanian_matches)} Romanian match(es)")
+        else:
+            if i % 100 == 0:
+                print(f"[{i}/{total}] Processing...")
+
     # Save results
     print(f"\nFound {len(correspondences)} Aromanian articles with Romanian correspondences")
-    
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(correspondences, f, ensure_ascii=False, indent=2)
-    
+
+    if orjson:
+        with open(OUTPUT_FILE, 'wb') as f:
+            f.write(orjson.dumps(correspondences, option=orjson.OPT_INDENT_2))
+    else:
+        with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
+            json.dump(correspondences, f, ensure_ascii=False, indent=2)
+
     print(f"Results saved to {OUTPUT_FILE}")
-    
+
     # Print summary statistics
     total_pairs = sum(len(c["romanian_articles"]) for c in correspondences)
     print(f"Total article pairs: {total_pairs}")
@@ -10,9 +10,10 @@ Supported sections:
 
 Output structure:
     output_{section}/
-    ├── index.json          # Lightweight metadata (url, title, date, filename)
-    ├── stats.json          # Crawl statistics
-    ├── progress.json       # Resumable crawl state
+    ├── index.msgpack       # Lightweight metadata (JSONL when msgpack missing)
+    ├── stats.json          # Crawl statistics (kept as JSON for humans)
+    ├── progress.msgpack    # Resumable crawl state (JSON when msgpack missing)
+    ├── articles.db         # SQLite mirror with an image-URL index
     └── articles/
         ├── category_12345.json
         └── ...
@@ -23,11 +24,16 @@ Usage:
     python rri_crawler.py --list-sections
 """
 
+import functools
 import json
+from collections import Counter
 import os
 import re
+import sqlite3
+import threading
 import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from typing import Optional
@@ -36,6 +42,55 @@ from urllib.parse import urljoin, urlparse
 import requests
 from bs4 import BeautifulSoup
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# lxml parses 3-10x faster than the pure-Python html.parser
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+try:
+    from requests_cache import CachedSession
+except ImportError:
+    CachedSession = None
+
+# Binary state files: smaller and faster to (de)serialize than JSON
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+def _load_json(path) -> object:
+    """Parse a JSON file, using orjson when available."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def _dumps_line(obj) -> bytes:
+    """Serialize one object as a JSONL line."""
+    if orjson:
+        return orjson.dumps(obj) + b'\n'
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def _dump_json(obj, path, indent: bool = True):
+    """Write a JSON file, using orjson when available."""
+    if orjson:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(obj, option=option))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(obj, f, indent=2 if indent else None, ensure_ascii=False)
+
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -50,10 +105,22 @@ logger = logging.getLogger(__name__)
 # Configuration
 BASE_URL = "https://www.rri.ro"
 ARTICLES_DIR = "articles"
-INDEX_FILE = "index.json"
+INDEX_FILE = "index.jsonl"
+INDEX_MSGPACK_FILE = "index.msgpack"
+LEGACY_INDEX_FILE = "index.json"
+ARTICLES_DB = "articles.db"
 STATS_FILE = "stats.json"
 PROGRESS_FILE = "progress.json"
+PROGRESS_MSGPACK_FILE = "progress.msgpack"
 REQUEST_DELAY = 1.0
+FETCH_CONCURRENCY = 4
+
+# Matches the numeric article id at the end of article URLs
+ARTICLE_ID_RE = re.compile(r'-id(\d+)\.html$')
+
+# Link extraction on listing pages runs over raw HTML bytes; pulling
+# hrefs with a regex skips DOM construction entirely
+HREF_RE = re.compile(rb'href="([^"]+)"')
 
 # Section configurations
 SECTIONS = {
@@ -144,110 +211,274 @@ class RRICrawler:
         self.section_config = SECTIONS[section]
         self.path_prefix = self.section_config["path_prefix"]
         self.category_pattern = self.section_config["category_pattern"]
+        self._category_re = re.compile(self.category_pattern)
+        # Fused pattern: section prefix + category + article id in one
+        # match; scheme stays loose so plain-http links still count
+        base_host = BASE_URL.split('://', 1)[1]
+        self._article_url_re = re.compile(
+            rf'^https?://{re.escape(base_host)}'
+            rf'{re.escape(self.section_config["path_prefix"])}'
+            rf'(?:([^/]+)/)?[^?#]*-id(\d+)\.html$')
+        # Each article URL is seen several times (link filter, filename,
+        # category); memoize the parse so the regex runs once per URL
+        self._parse_article_url = functools.lru_cache(maxsize=4096)(
+            self._parse_article_url_uncached)
         self.categories = self.section_config["categories"]
         
         # Output directory
         self.output_dir = output_dir or f"output_{section}"
         self.articles_dir = os.path.join(self.output_dir, ARTICLES_DIR)
-        
-        self.session = requests.Session()
+        os.makedirs(self.articles_dir, exist_ok=True)
+
+        # HTTP cache: conditional GETs (ETag/Last-Modified) mean unchanged
+        # pages cost a header round-trip instead of a full transfer
+        if CachedSession:
+            self.session = CachedSession(
+                os.path.join(self.output_dir, 'http_cache.sqlite'),
+                backend='sqlite',
+                cache_control=True,
+                expire_after=3600,
+            )
+        else:
+            self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
         })
         self.index: dict[str, IndexEntry] = {}  # url -> IndexEntry
         self.failed_urls: set[str] = set()
-        
-        os.makedirs(self.articles_dir, exist_ok=True)
+        # Listing-page memo: page URL -> links extracted on the last crawl,
+        # used to skip re-fetching pages that can't contain anything new
+        self.page_cache: dict[str, dict[str, list[str]]] = {}
+
+        # Requests are spread over FETCH_CONCURRENCY threads; the lock
+        # spaces them out so the aggregate rate still honours REQUEST_DELAY.
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+        # State files are msgpack when available, JSON(L) otherwise
+        if msgpack:
+            self._index_path = os.path.join(self.output_dir, INDEX_MSGPACK_FILE)
+            self._progress_path = os.path.join(self.output_dir, PROGRESS_MSGPACK_FILE)
+        else:
+            self._index_path = os.path.join(self.output_dir, INDEX_FILE)
+            self._progress_path = os.path.join(self.output_dir, PROGRESS_FILE)
+        self._index_log = None  # append handle for the index log
+
+        # SQLite mirror of the articles; the JSON files stay the
+        # interchange format, the database serves indexed queries
+        # (e.g. find_correspondences.py joins on img_idx). Created lazily
+        # on the first save so read-only runs (--stats) leave no empty db.
+        self._db = None
+
         self._load_state()
 
+    def _parse_article_url_uncached(self, url: str) -> Optional[tuple[str, str]]:
+        """Parse an article URL into (category, article_id), or None."""
+        match = self._article_url_re.match(url)
+        if not match:
+            return None
+        return (match.group(1) or "unknown", match.group(2))
+
     def _url_to_filename(self, url: str) -> str:
         """Convert URL to filename."""
-        match = re.search(r'-id(\d+)\.html$', url)
+        parsed = self._parse_article_url(url)
+        if parsed:
+            category, article_id = parsed
+            return f"{category}_{article_id}.json"
+
+        # Fallback for URLs outside the canonical article pattern
+        match = ARTICLE_ID_RE.search(url)
         article_id = match.group(1) if match else url.split('/')[-1].replace('.html', '')
-        
+
         path = urlparse(url).path
-        cat_match = re.search(self.category_pattern, path)
+        cat_match = self._category_re.search(path)
         category = cat_match.group(1) if cat_match else "unknown"
-        
+
         return f"{category}_{article_id}.json"
 
     def _load_state(self):
         """Load index and progress."""
-        # Load index
-        index_path = os.path.join(self.output_dir, INDEX_FILE)
-        if os.path.exists(index_path):
-            try:
-                with open(index_path, 'r', encoding='utf-8') as f:
-                    for item in json.load(f):
+        # Load index (append log; last write wins). Older formats are
+        # still read so existing crawls keep resuming.
+        msgpack_path = os.path.join(self.output_dir, INDEX_MSGPACK_FILE)
+        jsonl_path = os.path.join(self.output_dir, INDEX_FILE)
+        legacy_path = os.path.join(self.output_dir, LEGACY_INDEX_FILE)
+        try:
+            if msgpack and os.path.exists(msgpack_path):
+                with open(msgpack_path, 'rb') as f:
+                    for item in msgpack.Unpacker(f, raw=False):
                         self.index[item['url']] = IndexEntry(**item)
+            elif os.path.exists(jsonl_path):
+                with open(jsonl_path, 'rb') as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        item = orjson.loads(line) if orjson else json.loads(line)
+                        self.index[item['url']] = IndexEntry(**item)
+            elif os.path.exists(legacy_path):
+                for item in _load_json(legacy_path):
+                    self.index[item['url']] = IndexEntry(**item)
+            if self.index:
                 logger.info(f"Loaded index: {len(self.index)} articles")
-            except Exception as e:
-                logger.warning(f"Could not load index: {e}")
+        except Exception as e:
+            logger.warning(f"Could not load index: {e}")
 
         # Load progress (failed URLs)
-        progress_path = os.path.join(self.output_dir, PROGRESS_FILE)
-        if os.path.exists(progress_path):
-            try:
-                with open(progress_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.failed_urls = set(data.get('failed_urls', []))
-                logger.info(f"Loaded progress: {len(self.failed_urls)} failed")
-            except Exception as e:
-                logger.warning(f"Could not load progress: {e}")
+        msgpack_progress = os.path.join(self.output_dir, PROGRESS_MSGPACK_FILE)
+        json_progress = os.path.join(self.output_dir, PROGRESS_FILE)
+        try:
+            data = None
+            if msgpack and os.path.exists(msgpack_progress):
+                with open(msgpack_progress, 'rb') as f:
+                    data = msgpack.unpackb(f.read(), raw=False)
+            elif os.path.exists(json_progress):
+                data = _load_json(json_progress)
+            if data:
+                self.failed_urls = set(data.get('failed_urls', []))
+                self.page_cache = data.get('pages', {})
+                logger.info(f"Loaded progress: {len(self.failed_urls)} failed, "
+                            f"{len(self.page_cache)} listing pages")
+        except Exception as e:
+            logger.warning(f"Could not load progress: {e}")
+
+    @staticmethod
+    def _pack_entry(entry: IndexEntry) -> bytes:
+        """Serialize one index entry as a msgpack record or JSONL line."""
+        data = asdict(entry)
+        if msgpack:
+            return msgpack.packb(data, use_bin_type=True)
+        return _dumps_line(data)
+
+    def _append_index(self, entry: IndexEntry):
+        """Append one entry to the index log (O(1) per article)."""
+        if self._index_log is None:
+            self._index_log = open(self._index_path, 'ab')
+        self._index_log.write(self._pack_entry(entry))
+        self._index_log.flush()
 
     def _save_index(self):
-        """Save lightweight index."""
-        index_path = os.path.join(self.output_dir, INDEX_FILE)
-        data = [asdict(entry) for entry in self.index.values()]
-        with open(index_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        """Compact the index log: rewrite it atomically from memory."""
+        if self._index_log is not None:
+            self._index_log.close()
+            self._index_log = None
+        tmp_path = self._index_path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            for entry in self.index.values():
+                f.write(self._pack_entry(entry))
+        os.replace(tmp_path, self._index_path)
 
     def _save_progress(self):
         """Save failed URLs for retry."""
-        progress_path = os.path.join(self.output_dir, PROGRESS_FILE)
-        with open(progress_path, 'w', encoding='utf-8') as f:
-            json.dump({
-                'failed_urls': list(self.failed_urls),
-                'last_saved': datetime.now().isoformat()
-            }, f, ensure_ascii=False)
+        data = {
+            'failed_urls': list(self.failed_urls),
+            'pages': self.page_cache,
+            'last_saved': datetime.now().isoformat()
+        }
+        if msgpack:
+            with open(self._progress_path, 'wb') as f:
+                f.write(msgpack.packb(data, use_bin_type=True))
+        else:
+            _dump_json(data, self._progress_path, indent=False)
+
+    def _category_counts(self) -> dict[str, int]:
+        """Count indexed articles per category."""
+        return dict(Counter(entry.category for entry in self.index.values()))
 
     def _save_stats(self):
         """Save crawl statistics."""
         stats_path = os.path.join(self.output_dir, STATS_FILE)
-        categories = {}
-        for entry in self.index.values():
-            categories[entry.category] = categories.get(entry.category, 0) + 1
-        
         stats = {
             'total_articles': len(self.index),
             'failed_urls': len(self.failed_urls),
-            'articles_by_category': categories,
+            'articles_by_category': self._category_counts(),
             'last_updated': datetime.now().isoformat()
         }
-        with open(stats_path, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, indent=2, ensure_ascii=False)
+        _dump_json(stats, stats_path)
+
+    def _ensure_db(self) -> sqlite3.Connection:
+        """Open (and create on first use) the SQLite article mirror."""
+        if self._db is None:
+            self._db = sqlite3.connect(os.path.join(self.output_dir, ARTICLES_DB))
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS articles(url TEXT PRIMARY KEY, json BLOB)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS img_idx("
+                "image_url TEXT, filename TEXT, PRIMARY KEY(image_url, filename))")
+        return self._db
 
     def _save_article(self, article: Article) -> str:
-        """Save article to individual JSON file."""
+        """Save article to individual JSON file and the SQLite mirror."""
         filename = self._url_to_filename(article.url)
         filepath = os.path.join(self.articles_dir, filename)
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(asdict(article), f, indent=2, ensure_ascii=False)
+        data = asdict(article)
+        _dump_json(data, filepath)
+
+        payload = (orjson.dumps(data) if orjson
+                   else json.dumps(data, ensure_ascii=False).encode('utf-8'))
+        db = self._ensure_db()
+        with db:
+            db.execute(
+                "INSERT OR REPLACE INTO articles(url, json) VALUES(?, ?)",
+                (article.url, payload))
+            db.executemany(
+                "INSERT OR IGNORE INTO img_idx(image_url, filename) VALUES(?, ?)",
+                [(url, filename) for url in article.image_urls])
         return filename
 
-    def _fetch_page(self, url: str) -> Optional[BeautifulSoup]:
-        """Fetch a page."""
+    def _throttle(self):
+        """Block until this thread may issue the next request."""
+        with self._rate_lock:
+            wait = self._next_request_at - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._next_request_at = time.monotonic() + REQUEST_DELAY / FETCH_CONCURRENCY
+
+    def _fetch_response(self, url: str) -> Optional[requests.Response]:
+        """Fetch a URL, returning the raw response."""
         try:
-            time.sleep(REQUEST_DELAY)
+            self._throttle()
             response = self.session.get(url, timeout=30)
             response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
+            if getattr(response, 'from_cache', False):
+                # Cache hits never reached the server; refund the rate slot
+                with self._rate_lock:
+                    self._next_request_at = time.monotonic()
+            return response
         except requests.RequestException as e:
             logger.error(f"Failed to fetch {url}: {e}")
             self.failed_urls.add(url)
             return None
 
+    def _fetch_html(self, url: str) -> Optional[bytes]:
+        """Fetch a page as raw HTML bytes."""
+        response = self._fetch_response(url)
+        return None if response is None else response.content
+
+    def _head_last_modified(self, url: str) -> Optional[str]:
+        """Probe a page's Last-Modified header with a HEAD request."""
+        try:
+            self._throttle()
+            response = self.session.head(url, timeout=30, allow_redirects=True)
+            response.raise_for_status()
+            return response.headers.get('Last-Modified')
+        except requests.RequestException as e:
+            logger.debug(f"HEAD failed for {url}: {e}")
+            return None
+
+    def _fetch_page(self, url: str) -> Optional[BeautifulSoup]:
+        """Fetch and parse a page.
+
+        Raw bytes go straight to the parser so encoding is detected once
+        from the document itself, with no extra str materialization.
+        """
+        html = self._fetch_html(url)
+        if html is None:
+            return None
+        return BeautifulSoup(html, HTML_PARSER)
+
     def _extract_article(self, soup: BeautifulSoup, url: str) -> Article:
         """Extract article content."""
         # Title
@@ -267,9 +498,13 @@ class RRICrawler:
                     break
 
         # Category
-        path = urlparse(url).path
-        cat_match = re.search(self.category_pattern, path)
-        category = cat_match.group(1) if cat_match else "unknown"
+        parsed = self._parse_article_url(url)
+        if parsed:
+            category = parsed[0]
+        else:
+            path = urlparse(url).path
+            cat_match = self._category_re.search(path)
+            category = cat_match.group(1) if cat_match else "unknown"
 
         # Content
         content = ""
@@ -320,22 +555,20 @@ class RRICrawler:
         )
 
     def _is_article_url(self, url: str) -> bool:
-        return bool(re.search(r'-id\d+\.html$', url))
+        return self._parse_article_url(url) is not None
 
-    def _extract_links(self, soup: BeautifulSoup, base_url: str) -> tuple[list[str], list[str]]:
-        """Extract article and pagination links."""
-        articles, pages = [], []
-        for a in soup.find_all('a', href=True):
-            href = a['href']
+    def _extract_links(self, html: bytes, base_url: str) -> tuple[set[str], set[str]]:
+        """Extract article and pagination links from raw listing HTML."""
+        articles, pages = set(), set()
+        for match in HREF_RE.finditer(html):
+            href = match.group(1).decode('utf-8', 'replace')
             full_url = urljoin(base_url, href)
-            # Check if URL belongs to this section
-            if self.path_prefix not in full_url:
-                continue
-            if self._is_article_url(full_url):
-                articles.append(full_url)
-            elif 'page=' in href or '/page/' in href:
-                pages.append(full_url)
-        return list(set(articles)), list(set(pages))
+            # One fused match covers section prefix, category and id
+            if self._parse_article_url(full_url):
+                articles.add(full_url)
+            elif self.path_prefix in full_url and ('page=' in href or '/page/' in href):
+                pages.add(full_url)
+        return articles, pages
 
     def crawl_category(self, category_url: str, max_pages: int = 100):
         """Crawl a category."""
@@ -345,54 +578,75 @@ class RRICrawler:
         pages_to_visit = [full_url]
         visited_pages = set()
         new_articles = 0
-        
-        while pages_to_visit and len(visited_pages) < max_pages:
-            page_url = pages_to_visit.pop(0)
-            if page_url in visited_pages:
-                continue
-            
-            visited_pages.add(page_url)
-            soup = self._fetch_page(page_url)
-            if not soup:
-                continue
-            
-            article_links, page_links = self._extract_links(soup, page_url)
-            logger.info(f"Found {len(article_links)} articles on {page_url}")
-            
-            for article_url in article_links:
-                # Skip if already indexed
-                if article_url in self.index:
+
+        with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as executor:
+            while pages_to_visit and len(visited_pages) < max_pages:
+                page_url = pages_to_visit.pop(0)
+                if page_url in visited_pages:
                     continue
-                
-                logger.info(f"Crawling: {article_url}")
-                article_soup = self._fetch_page(article_url)
-                if not article_soup:
+
+                visited_pages.add(page_url)
+
+                # If every article this page yielded last time is already
+                # indexed AND a HEAD probe confirms the page is unchanged,
+                # reuse its cached links and skip the full fetch
+                cached = self.page_cache.get(page_url)
+                if (cached and cached.get('last_modified')
+                        and all(url in self.index for url in cached['articles'])
+                        and self._head_last_modified(page_url) == cached['last_modified']):
+                    logger.info(f"Skipping unchanged listing: {page_url}")
+                    for link in cached['pages']:
+                        if link not in visited_pages:
+                            pages_to_visit.append(link)
                     continue
-                
-                # Extract and save article
-                article = self._extract_article(article_soup, article_url)
-                filename = self._save_article(article)
-                
-                # Add to index
-                self.index[article_url] = IndexEntry(
-                    url=article_url,
-                    title=article.title,
-                    date=article.date,
-                    category=article.category,
-                    filename=filename
-                )
-                new_articles += 1
-                logger.info(f"Saved: {article.title[:50]}...")
-                
-                # Periodic save (index only, articles already saved)
-                if new_articles % 10 == 0:
-                    self._save_index()
-                    self._save_progress()
-            
-            for link in page_links:
-                if link not in visited_pages:
-                    pages_to_visit.append(link)
-        
+
+                response = self._fetch_response(page_url)
+                if not response:
+                    continue
+
+                article_links, page_links = self._extract_links(
+                    response.content, page_url)
+                self.page_cache[page_url] = {
+                    'articles': sorted(article_links),
+                    'pages': sorted(page_links),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }
+                logger.info(f"Found {len(article_links)} articles on {page_url}")
+
+                # Skip already-indexed articles, fetch the rest concurrently
+                new_urls = [url for url in article_links if url not in self.index]
+                for article_url, article_soup in zip(
+                        new_urls, executor.map(self._fetch_page, new_urls)):
+                    if not article_soup:
+                        continue
+
+                    # Extract and save article
+                    article = self._extract_article(article_soup, article_url)
+                    filename = self._save_article(article)
+
+                    # Add to index; the log append makes it durable immediately
+                    entry = IndexEntry(
+                        url=article_url,
+                        title=article.title,
+                        date=article.date,
+                        category=article.category,
+                        filename=filename
+                    )
+                    self.index[article_url] = entry
+                    self._append_index(entry)
+                    new_articles += 1
+                    logger.info(f"Saved: {article.title[:50]}...")
+
+                    # Periodic progress save; compact the log occasionally
+                    if new_articles % 10 == 0:
+                        self._save_progress()
+                    if new_articles % 1000 == 0:
+                        self._save_index()
+
+                for link in page_links:
+                    if link not in visited_pages:
+                        pages_to_visit.append(link)
+
         return new_articles
 
     def crawl_all(self, max_pages_per_category: int = 100):
@@ -417,15 +671,12 @@ class RRICrawler:
 
     def get_stats(self) -> dict:
         """Get current statistics."""
-        categories = {}
-        for entry in self.index.values():
-            categories[entry.category] = categories.get(entry.category, 0) + 1
         return {
             'section': self.section,
             'section_name': self.section_config['name'],
             'total': len(self.index),
             'failed': len(self.failed_urls),
-            'by_category': categories,
+            'by_category': self._category_counts(),
         }
 
 